@@ -1,19 +1,28 @@
 #!/usr/bin/env python3
 
+import atexit
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+import errno
+import functools
 import json
 import os
+import queue
 from pathlib import Path
+import shutil
 import subprocess
+import sys
+import threading
 from tempfile import TemporaryDirectory
-from typing import Optional
+from typing import Optional, TextIO
 from urllib.parse import urlparse
 
 import re
-import hashlib
 
 import click
+import httpx
 import inquirer
-from jsonpath_ng import parse
+from blake3 import blake3
 from loguru import logger
 from pykakasi import Kakasi
 
@@ -23,11 +32,164 @@ SEPARATOR = os.environ.get("TOOL_SEPARATOR", "_")
 AUTHOR_MAPPING_FILE = Path(
     os.path.dirname(os.path.realpath(__file__)), "author_mapping.json"
 )
+
+# The unescaped dot after cdn is on purpose, images are served from cdna, cdnb and so on
+DIRECT_LINK_PATTERN = re.compile(
+    r"https://cdn.\.artstation\.com/p/assets/images/images.*"
+)
+# Same hosts and artwork ids as gallery-dl's own artstation pattern, so that it handles every link that matches
+INDIRECT_LINK_PATTERN = re.compile(r"https://(?:[\w-]+\.)?artstation\.com/artwork/(\w+)/?")
+# <author>_id<pixiv_id>_<postfix>, the last id wins in case the author name has one too
+PIXIV_ID_PATTERN = re.compile(r".*_id(\d+)")
+
+# Message type of downloadable file urls in gallery-dl -j output
+GALLERY_DL_URL_MESSAGE = 3
+
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Long read timeout like wget's, artstation's cdn can stall on big originals
+DOWNLOAD_TIMEOUT = httpx.Timeout(30.0, read=900.0)
+# Only failed connection attempts are retried, a failed transfer keeps its link for the next run
+DOWNLOAD_RETRIES = 5
+
+EXIFTOOL_PROCESSES = 4
+
+# Names claimed by moves that are still in progress, set once the file is in place
+PENDING_MOVES: dict[Path, threading.Event] = {}
+PENDING_MOVES_LOCK = threading.Lock()
+
 AUTHOR_MAPPING: dict[str, str] = {}
+AUTHOR_MAPPING_LOADED = False
+AUTHOR_MAPPING_DIRTY = False
+
+
+class PromptSafeSink:
+    """Log sink that holds messages back while the user is prompted, so that background work can't garble the prompt."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.held: Optional[list[str]] = None
+
+    def write(self, message: str):
+        with self.lock:
+            if self.held is not None:
+                self.held.append(message)
+            else:
+                sys.stderr.write(message)
+
+    @contextmanager
+    def prompting(self):
+        with self.lock:
+            self.held = []
+        try:
+            yield
+        finally:
+            with self.lock:
+                sys.stderr.write("".join(self.held))
+                self.held = None
+
+
+LOG_SINK = PromptSafeSink()
+logger.remove()
+logger.add(LOG_SINK.write, colorize=sys.stderr.isatty())
+
+
+def file_hash(filename: Path):
+    stat = filename.stat()
+    return cached_file_hash(filename, stat.st_mtime_ns, stat.st_size)
+
+
+# Keyed on mtime and size too, so a file is only rehashed after it changes
+@functools.lru_cache(maxsize=4096)
+def cached_file_hash(filename: Path, mtime_ns: int, size: int):
+    # Only used to detect local duplicates, so any fast hash will do
+    return blake3(max_threads=blake3.AUTO).update_mmap(filename).hexdigest()
+
+
+# gallery-dl -j prints one indented json document per link, back to back
+def iter_json_documents(stream: TextIO):
+    decoder = json.JSONDecoder()
+    lines: list[str] = []
+    for line in stream:
+        lines.append(line)
+        # A document can only end on an unindented line, don't bother decoding before that
+        if line[:1].isspace():
+            continue
+
+        text = "".join(lines).lstrip()
+        try:
+            document, end = decoder.raw_decode(text)
+        except json.JSONDecodeError:
+            continue
+
+        lines = [text[end:].lstrip()]
+        yield document
+
+
+def forward_gallery_dl_log(stream: TextIO):
+    try:
+        for line in stream:
+            line = line.rstrip()
+            level = "WARNING" if "][error]" in line or "][warning]" in line else "DEBUG"
+            logger.log(level, f"gallery-dl: {line}")
+    except (ValueError, OSError):
+        pass  # Pipe got closed because resolving was aborted
+
+
+def resolve_links(links: list[str]):
+    if len(links) == 0:
+        return
+
+    # gallery-dl prints nothing for links it can't handle, so documents are matched
+    # to links by artwork id rather than by their position in the output
+    pending_links: dict[str, list[str]] = {}
+    for link in links:
+        artwork_id = INDIRECT_LINK_PATTERN.fullmatch(link).group(1)
+        pending_links.setdefault(artwork_id, []).append(link)
+
+    # Resolve all links with a single gallery-dl run instead of two runs per link,
+    # handing out each link's info as soon as it's printed
+    with subprocess.Popen(
+        ["gallery-dl", "-j", *links],
+        stdout=subprocess.PIPE,
+        # Goes through the logger, gallery-dl writing to the terminal directly would garble prompts
+        stderr=subprocess.PIPE,
+        encoding="utf-8",
+    ) as process:
+        log_forwarder = threading.Thread(
+            target=forward_gallery_dl_log, args=(process.stderr,), daemon=True
+        )
+        log_forwarder.start()
+
+        for link_info in iter_json_documents(process.stdout):
+            artwork_id = find_first_key(link_info, "hash_id")
+            if len(waiting := pending_links.get(artwork_id, [])) == 0:
+                logger.error(f"gallery-dl returned info for an unexpected artwork {artwork_id}")
+                continue
+            yield waiting.pop(0), link_info
 
+        log_forwarder.join()
 
-def sha256sum(filename: Path):
-    return hashlib.sha256(filename.read_bytes()).hexdigest()
+    if process.returncode != 0:
+        logger.warning(f"gallery-dl exited with code {process.returncode}")
+
+    for waiting in pending_links.values():
+        for link in waiting:
+            logger.error(f"gallery-dl returned no info for {link}")
+
+
+# Equivalent of the first match of jsonpath "$..key", without building a jsonpath AST
+def find_first_key(obj, key: str):
+    stack = [obj]
+    while len(stack) > 0:
+        item = stack.pop()
+        if isinstance(item, dict):
+            if key in item:
+                return item[key]
+            stack.extend(reversed(item.values()))
+        elif isinstance(item, list):
+            stack.extend(reversed(item))
+    return None
 
 
 def strip_link(link: str):
@@ -35,99 +197,278 @@ def strip_link(link: str):
 
 
 def ensure_author_mapping_loaded():
-    if not AUTHOR_MAPPING_FILE.exists():
-        AUTHOR_MAPPING_FILE.write_text("{}", encoding="utf-8")
+    global AUTHOR_MAPPING, AUTHOR_MAPPING_LOADED
+    if AUTHOR_MAPPING_LOADED:
+        return
 
-    global AUTHOR_MAPPING
-    AUTHOR_MAPPING = json.loads(AUTHOR_MAPPING_FILE.read_text(encoding="utf-8"))
+    if AUTHOR_MAPPING_FILE.exists():
+        AUTHOR_MAPPING = json.loads(AUTHOR_MAPPING_FILE.read_text(encoding="utf-8"))
+    AUTHOR_MAPPING_LOADED = True
+
+
+def flush_author_mapping():
+    global AUTHOR_MAPPING_DIRTY
+    if not AUTHOR_MAPPING_DIRTY:
+        return
+
+    # Write to a sibling file first so an interrupted write can't corrupt the mapping
+    temp_file = AUTHOR_MAPPING_FILE.with_suffix(".json.tmp")
+    temp_file.write_text(json.dumps(AUTHOR_MAPPING), encoding="utf-8")
+    os.replace(temp_file, AUTHOR_MAPPING_FILE)
+    AUTHOR_MAPPING_DIRTY = False
+
+
+atexit.register(flush_author_mapping)
 
 
 def get_author_mapping(author: str):
     ensure_author_mapping_loaded()
-    global AUTHOR_MAPPING
     return AUTHOR_MAPPING.get(author, None)
 
 
 def set_author_mapping(author: str, maps_to: str):
     ensure_author_mapping_loaded()
-    global AUTHOR_MAPPING
+    global AUTHOR_MAPPING_DIRTY
     AUTHOR_MAPPING[author] = maps_to
+    AUTHOR_MAPPING_DIRTY = True
+
 
-    AUTHOR_MAPPING_FILE.write_text(json.dumps(AUTHOR_MAPPING), encoding="utf-8")
+@functools.lru_cache(maxsize=1)
+def get_kakasi():
+    return Kakasi()
+
+
+# Authors usually have many folders, only convert each name once
+@functools.lru_cache(maxsize=4096)
+def romanize(name: str):
+    return "".join([item["hepburn"] for item in get_kakasi().convert(name)])
 
 
 def get_or_prompt_username_mapping(original: str, recommended: str) -> str:
     if (existing := get_author_mapping(original)) is not None:
         return existing
 
-    print(f"{original} has no mapping. Input a new name or accept [{recommended}]:")
-    mapped = (input() or "").strip()
+    with LOG_SINK.prompting():
+        print(f"{original} has no mapping. Input a new name or accept [{recommended}]:")
+        mapped = (input() or "").strip()
     ret = mapped if len(mapped) > 0 else recommended
     set_author_mapping(original, ret)
     return ret
 
 
-def smart_move(source: Path, target: Path, tags: list[str]):
-    if not target.exists():
-        source.rename(target)
-        logger.info(f"{source} -> {target}")
-        return
+def reserve_name(path: Path) -> bool:
+    with PENDING_MOVES_LOCK:
+        if path in PENDING_MOVES or path.exists():
+            return False
+        PENDING_MOVES[path] = threading.Event()
+    return True
+
+
+def release_name(path: Path):
+    with PENDING_MOVES_LOCK:
+        PENDING_MOVES.pop(path).set()
+
+
+def wait_for_pending_move(path: Path) -> bool:
+    with PENDING_MOVES_LOCK:
+        pending = PENDING_MOVES.get(path)
+    if pending is None:
+        return False
+    pending.wait()
+    return True
+
+
+def move_file(source: Path, target: Path):
+    try:
+        os.replace(source, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Different filesystems, copy next to the target first so that it only shows up complete
+        partial = target.with_name(f".{target.name}.partial")
+        try:
+            if source.is_dir():
+                shutil.copytree(source, partial)
+            else:
+                shutil.copy2(source, partial)
+            os.replace(partial, target)
+        finally:
+            if partial.is_dir():
+                shutil.rmtree(partial)
+            else:
+                partial.unlink(missing_ok=True)
+        if source.is_dir():
+            shutil.rmtree(source)
+        else:
+            source.unlink()
+
+
+def read_until_ready(stream: TextIO) -> tuple[str, str]:
+    lines: list[str] = []
+    for line in stream:
+        if (line := line.rstrip("\n")).endswith("{ready}"):
+            return "\n".join(lines), line.removesuffix("{ready}")
+        lines.append(line)
+    raise RuntimeError("exiftool exited unexpectedly")
+
+
+class Exiftool:
+    """A few long running exiftool processes, so perl only starts a couple of times per command instead of once per file."""
+
+    def __init__(self, processes: int = EXIFTOOL_PROCESSES):
+        self.size = processes
+        self.processes: list[subprocess.Popen] = []
+        # A process runs one command at a time, otherwise outputs would interleave
+        self.idle: queue.Queue[subprocess.Popen] = queue.Queue()
+
+    def __enter__(self):
+        for _ in range(self.size):
+            process = subprocess.Popen(
+                ["exiftool", "-stay_open", "True", "-@", "-"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                encoding="utf-8",
+            )
+            self.processes.append(process)
+            self.idle.put(process)
+        return self
+
+    def __exit__(self, *exc_info):
+        for process in self.processes:
+            process.communicate("-stay_open\nFalse\n")
 
+    def execute(self, *args: str) -> str:
+        process = self.idle.get()
+        try:
+            # -echo4 writes the command's exit status to stderr once it's done, that's
+            # the only place exiftool reports it in -stay_open mode
+            process.stdin.write("\n".join([*args, "-echo4", "${status}{ready}", "-execute"]) + "\n")
+            process.stdin.flush()
+
+            output, _ = read_until_ready(process.stdout)
+            errors, status = read_until_ready(process.stderr)
+        finally:
+            self.idle.put(process)
+
+        if int(status) != 0:
+            raise subprocess.CalledProcessError(int(status), ["exiftool", *args], output, errors)
+        if len(errors) > 0:
+            logger.warning(f"exiftool: {errors}")
+
+        return output
+
+
+def smart_move(source: Path, target: Path, tags: list[str], exiftool: Exiftool):
     orig_stem = target.stem
-    temp_hash = sha256sum(source)
+    source_is_dir = source.is_dir()  # Subfolders are moved as a whole, never hashed or tagged
+    source_size = source.stat().st_size
+    source_hash: Optional[str] = None  # Only computed once a same-sized target shows up
+
+    # Names are claimed in PENDING_MOVES until the file is in place, so concurrent moves never pick
+    # the same one and only the claim itself is locked, not the hashing, tagging or copying
+    target = target.absolute()
+    i = 0
+    while not reserve_name(target):
+        # Claimed by a move that's still running, compare against what it puts there
+        if wait_for_pending_move(target):
+            continue
 
-    i = 1
-    while target.exists():
         logger.warning(f"{target} already exists")
 
-        target_hash = sha256sum(target)
+        try:
+            if source_is_dir or target.is_dir():
+                logger.warning("Not comparing folders, adding postfix")
+            elif target.stat().st_size != source_size:
+                logger.warning("Sizes don't match, adding postfix")
+            else:
+                if source_hash is None:
+                    source_hash = file_hash(source)
 
-        if target_hash == temp_hash:
-            logger.warning("Hashes match, not moving")
-            return
+                if file_hash(target) == source_hash:
+                    logger.warning("Hashes match, not moving")
+                    return
+
+                logger.warning("Hashes don't match, adding postfix")
+        except FileNotFoundError:
+            continue  # Gone in the meantime, try to claim it again
 
-        logger.warning("Hashes don't match, adding postfix")
-        target = target.with_stem(f"{orig_stem}_{i}")
         i += 1
+        target = target.with_stem(f"{orig_stem}_{i}")
+
+    try:
+        # Tag before the file takes its name, nobody may hash it halfway through a rewrite
+        if i > 0 and not source_is_dir:
+            exiftool.execute(
+                "-overwrite_original",
+                # Get rid of retarded photoshop tags
+                "-HistoryParameters=",
+                "-HistoryWhen=",
+                "-HistorySoftwareAgent=",
+                "-HistoryInstanceID=",
+                "-HistoryChanged=",
+                "-HistoryAction=",
+                "-DocumentID=",
+                "-DerivedFromInstanceID=",
+                "-DerivedFromDocumentID=",
+                "-DerivedFromOriginalDocumentID=",
+                "-InstanceID=",
+                "-OriginalDocumentID=",
+                "-DocumentAncestors=",
+                # Add tags
+                f"-Subject={', '.join(tags)}",
+                source.absolute().as_posix(),
+            )
+        move_file(source, target)
+    finally:
+        release_name(target)
 
-    source.rename(target)
-    # Get rid of retarded photoshop tags
-    subprocess.check_call(
-        [
-            "exiftool",
-            "-overwrite_original",
-            "-HistoryParameters=",
-            "-HistoryWhen=",
-            "-HistorySoftwareAgent=",
-            "-HistoryInstanceID=",
-            "-HistoryChanged=",
-            "-HistoryAction=",
-            "-DocumentID=",
-            "-DerivedFromInstanceID=",
-            "-DerivedFromDocumentID=",
-            "-DerivedFromOriginalDocumentID=",
-            "-InstanceID=",
-            "-OriginalDocumentID=",
-            "-DocumentAncestors=",
-            target.absolute().as_posix()
-        ],
-        stdout=subprocess.STDOUT,
-        stderr=subprocess.STDOUT
-    )
-    # Add tags
-    subprocess.check_call(
-        [
-            "exiftool",
-            "-overwrite_original",
-            f"-Subject={', '.join(tags)}",
-            target.absolute().as_posix()
-        ],
-        stdout=subprocess.STDOUT,
-        stderr=subprocess.STDOUT
-    )
     logger.info(f"{source} -> {target}")
 
 
+def download_file(client: httpx.Client, url: str, path: Path):
+    with client.stream("GET", url) as response:
+        response.raise_for_status()
+        with path.open("wb") as f:
+            for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+
+
+def download_image(
+    client: httpx.Client,
+    exiftool: Exiftool,
+    download_link: str,
+    temp_path: Path,
+    destination_subfolder: Path,
+    username: str,
+    tags: list[str],
+):
+    filename = os.path.basename(urlparse(download_link).path)
+
+    logger.info(f"Downloading {download_link} filename={filename} author={username}")
+
+    final_path = Path(destination_subfolder, filename)
+    download_file(client, download_link, temp_path)
+    smart_move(temp_path, final_path, tags, exiftool)
+
+
+def cleanup_when_done(temp_dir: TemporaryDirectory, futures: list[Future]):
+    remaining = len(futures)
+    lock = threading.Lock()
+
+    def on_done(_: Future):
+        nonlocal remaining
+        with lock:
+            remaining -= 1
+            if remaining > 0:
+                return
+        # Also takes skipped duplicates with it
+        temp_dir.cleanup()
+
+    for future in futures:
+        future.add_done_callback(on_done)
+
+
 @click.command()
 @click.option(
     "--links-file",
@@ -147,135 +488,145 @@ def download_artstation(
 ):
     """This command downloads pictures from artstation."""
 
-    try:
-        subprocess.run(
-            ["gallery-dl", "-v"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True,
-        )
-    except subprocess.CalledProcessError as e:
-        logger.error("Error running gallery-dl -v", e.returncode, e.output)
+    if shutil.which("gallery-dl") is None:
+        logger.error("gallery-dl not found")
+        return
 
-    try:
-        subprocess.run(
-            ["exiftool", "-v"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True,
-        )
-    except subprocess.CalledProcessError as e:
-        logger.error("Error running exiftool -v", e.returncode, e.output)
+    if shutil.which("exiftool") is None:
+        logger.error("exiftool not found")
+        return
 
     links_source_file = Path(links_file_path)
 
-    all_links = set(
-        lst
-        for link in links_source_file.read_text(encoding="utf-8").split("\n")
-        if len(lst := strip_link(link)) > 0
-    )
+    with links_source_file.open(encoding="utf-8") as links_source:
+        all_links = set(
+            lst for link in links_source if len(lst := strip_link(link)) > 0
+        )
 
-    direct_links = set(
-        link
-        for link in all_links
-        if re.fullmatch(r"https://cdn.\.artstation.com/p/assets/images/images.*", link)
-    )
-    indirect_links = set(
-        link
-        for link in all_links
-        if re.fullmatch(r"https://.*?artstation\.com/artwork/.+", link)
-    )
-    unknown_links = set(
-        link
-        for link in all_links
-        if (link not in direct_links and link not in indirect_links)
-    )
+    direct_links: set[str] = set()
+    indirect_links: set[str] = set()
+    unknown_links: set[str] = set()
+    for link in all_links:
+        if DIRECT_LINK_PATTERN.fullmatch(link):
+            direct_links.add(link)
+        elif INDIRECT_LINK_PATTERN.fullmatch(link):
+            indirect_links.add(link)
+        else:
+            unknown_links.add(link)
 
     if len(unknown_links) > 0:
         logger.warning(f"{len(unknown_links)} are unknown")
 
-    for link in indirect_links:
-        link_info = json.loads(subprocess.check_output(["gallery-dl", link, "-j"]))
-
-        username = next(iter(parse("$..username").find(link_info)), "")
-
-        if len(username) == 0:
-            logger.error(f"Username not found for {link}")
-            continue
-
-        tags: list[str] = next(iter(parse("$..tags").find(link_info)), [])
-
-        gallery_dl_raw_links = subprocess.check_output(
-            ["gallery-dl", link, "-g"]
-        ).decode("utf-8")
-        resolved_links = [
-            lnk
-            for link in gallery_dl_raw_links.split("\n")
-            if len(lnk := link.strip()) > 0
-            and not lnk.startswith(
-                "|"
-            )  # Skip medium/low quality images from gallery-dl
-        ]
-
-        links_to_download = set(
-            link for link in resolved_links if strip_link(link) in direct_links
-        )  # If a resolved link was found in the list, use that and skip selection
-
-        direct_links.symmetric_difference_update(links_to_download) # remove found direct links
-
-        if len(resolved_links) > 1 and len(links_to_download) == 0:
-            checkbox_name = "images"
-            questions = [
-                inquirer.Checkbox(
-                    checkbox_name,
-                    message=f"Multiple images found at {link}. Select images to download",
-                    carousel=True,
-                    choices=resolved_links,
-                ),
+    # One client for all downloads so connections to the cdn are reused.
+    # Downloads run in the background while the main thread goes on with the next links and prompts
+    with (
+        httpx.Client(
+            transport=httpx.HTTPTransport(http2=True, retries=DOWNLOAD_RETRIES),
+            timeout=DOWNLOAD_TIMEOUT,
+            follow_redirects=True,
+        ) as client,
+        Exiftool() as exiftool,
+        ExitStack() as temp_dirs,
+        ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor,
+    ):
+        downloads: list[tuple[str, Future]] = []
+        # Links are only taken out of the links file once they were handled
+        unhandled_links = set(indirect_links)
+        for link, link_info in resolve_links(list(indirect_links)):
+            username = find_first_key(link_info, "username") or ""
+
+            if len(username) == 0:
+                logger.error(f"Username not found for {link}")
+                continue
+
+            tags: list[str] = find_first_key(link_info, "tags") or []
+
+            # Same as gallery-dl -g, which would otherwise need another run per link
+            resolved_links = [
+                message[1]
+                for message in link_info
+                if message[0] == GALLERY_DL_URL_MESSAGE
             ]
 
-            links_to_download = inquirer.prompt(questions)[checkbox_name]
+            links_to_download = set(
+                link for link in resolved_links if strip_link(link) in direct_links
+            )  # If a resolved link was found in the list, use that and skip selection
 
-            logger.info(f"You selected: {links_to_download}")
+            direct_links.symmetric_difference_update(links_to_download) # remove found direct links
 
-        if len(links_to_download) > 0:
-            postfix = "artstation"
+            if len(resolved_links) > 1 and len(links_to_download) == 0:
+                checkbox_name = "images"
+                questions = [
+                    inquirer.Checkbox(
+                        checkbox_name,
+                        message=f"Multiple images found at {link}. Select images to download",
+                        carousel=True,
+                        choices=resolved_links,
+                    ),
+                ]
 
-            destination_subfolder_naive = Path(
-                destination_folder, f"{username}{postfix}"
-            )
+                with LOG_SINK.prompting():
+                    links_to_download = inquirer.prompt(questions)[checkbox_name]
 
-            if destination_subfolder_naive.exists():
-                destination_subfolder = destination_subfolder_naive
-            else:
-                author = get_or_prompt_username_mapping(username, username)
+                logger.info(f"You selected: {links_to_download}")
 
-                destination_subfolder = Path(destination_folder, f"{author}_{postfix}")
-                os.makedirs(destination_subfolder, exist_ok=True)
+            if len(links_to_download) > 0:
+                postfix = "artstation"
 
-        else:
-            logger.warning(f"Not downloading anything for {link}")
+                destination_subfolder_naive = Path(
+                    destination_folder, f"{username}{postfix}"
+                )
 
-        for download_link in links_to_download:
-            filename = os.path.basename(urlparse(download_link).path)
+                if destination_subfolder_naive.exists():
+                    destination_subfolder = destination_subfolder_naive
+                else:
+                    author = get_or_prompt_username_mapping(username, username)
 
-            logger.info(f"Downloading {link} filename={filename} author={username}")
+                    destination_subfolder = Path(destination_folder, f"{author}_{postfix}")
+                    os.makedirs(destination_subfolder, exist_ok=True)
 
-            with TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir, filename)
-                final_path = Path(destination_subfolder, filename)
-                subprocess.run(
-                    ["wget", "-O", temp_path, download_link],
-                    stdout=subprocess.STDOUT,
-                    stderr=subprocess.STDOUT,
-                    check=True,
-                )
-                smart_move(temp_path, final_path, tags)
+                # One temp dir per link, on the same filesystem so smart_move only has to rename.
+                # Also on the exit stack, so that it's removed when the command is aborted
+                temp_dir = TemporaryDirectory(dir=destination_subfolder, prefix=".download_")
+                temp_dirs.enter_context(temp_dir)
 
-    # We are done here, save unknown links
-    if len(indirect_links) > 0:
-        logger.warning(f"{len(indirect_links)} dangling direct links left")
-    links_source_file.write_text("\n".join(unknown_links.union(direct_links)), encoding="utf-8")
+            else:
+                logger.warning(f"Not downloading anything for {link}")
+
+            link_downloads = [
+                executor.submit(
+                    download_image,
+                    client,
+                    exiftool,
+                    download_link,
+                    # Urls of one link can share a file name, keep the extension for exiftool
+                    Path(temp_dir.name, f"{index}_{os.path.basename(urlparse(download_link).path)}"),
+                    destination_subfolder,
+                    username,
+                    tags,
+                )
+                for index, download_link in enumerate(links_to_download)
+            ]
+            if len(link_downloads) > 0:
+                cleanup_when_done(temp_dir, link_downloads)
+            downloads.extend((link, download) for download in link_downloads)
+
+            unhandled_links.discard(link)
+
+        # Report failures per link and keep the link, so the next run tries it again
+        for link, download in downloads:
+            if (error := download.exception()) is not None:
+                logger.error(f"Download from {link} failed: {error!r}")
+                unhandled_links.add(link)
+
+    # We are done here, save unknown and unhandled links
+    if len(direct_links) > 0:
+        logger.warning(f"{len(direct_links)} dangling direct links left")
+    if len(unhandled_links) > 0:
+        logger.warning(f"{len(unhandled_links)} artwork links were not handled, keeping them")
+    links_source_file.write_text(
+        "\n".join(unknown_links | direct_links | unhandled_links), encoding="utf-8"
+    )
 
 
 @click.command()
@@ -304,51 +655,44 @@ def move_pixiv(source_folder_path: str, destination_folder_path: str, postfix: s
         logger.error("Please enter valid source_folder")
         return
 
-    try:
-        subprocess.run(
-            ["exiftool", "-v"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True,
-        )
-    except subprocess.CalledProcessError as e:
-        logger.error("Error running exiftool -v", e.returncode, e.output)
+    if shutil.which("exiftool") is None:
+        logger.error("exiftool not found")
         return
 
-    converter = Kakasi()
-    source_subfolders = [Path(f) for f in os.scandir(source_folder_path) if f.is_dir()]
-    destination_subfolders = [
-        Path(f) for f in os.scandir(destination_folder_path) if f.is_dir()
-    ]
+    destination_root = Path(destination_folder_path)
+    # Keep the DirEntries, they already know whether they're a directory and what they're called
+    source_subfolders = [f for f in os.scandir(source_folder_path) if f.is_dir()]
+    destination_subfolders_by_id: dict[str, Path] = {}
+    for destination_subfolder in os.scandir(destination_folder_path):
+        if not destination_subfolder.is_dir():
+            continue
+        if (match := PIXIV_ID_PATTERN.match(destination_subfolder.name)) is not None:
+            destination_subfolders_by_id.setdefault(
+                match.group(1), Path(destination_subfolder.path)
+            )
 
-    for source_subfolder in source_subfolders:
-        parts = source_subfolder.name.split(SEPARATOR)  # <author_name>_<id>
+    # Moves are mostly waiting on the disk and exiftool, so overlap them with each other and with prompts
+    with Exiftool() as exiftool, ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        moves: list[Future] = []
+        for source_subfolder in source_subfolders:
+            name, _, pixiv_id = source_subfolder.name.rpartition(SEPARATOR)  # <author_name>_<id>
 
-        name = SEPARATOR.join(parts[:-1])
-        pixiv_id = parts[-1]
+            recommended_name = name if name.isascii() else romanize(name)
 
-        recommended_name = (
-            name
-            if name.isascii()
-            else "".join([item["hepburn"] for item in converter.convert(name)])
-        )
+            target_subfolder_f = destination_subfolders_by_id.get(pixiv_id)
 
-        target_subfolder_f: Optional[Path] = None
+            if target_subfolder_f is None:
+                author = get_or_prompt_username_mapping(name, recommended_name)
+                target_subfolder_f = destination_root / f"{author}_id{pixiv_id}_{postfix}"
 
-        for target_subfolder in destination_subfolders:
-            if f"id{pixiv_id}" in target_subfolder.stem:
-                target_subfolder_f = target_subfolder
-                break
-
-        if target_subfolder_f is None:
-            author = get_or_prompt_username_mapping(name, recommended_name)
-            target_subfolder_f = Path(
-                destination_folder_path, f"{author}_id{pixiv_id}_{postfix}"
-            )
+            for source_file in os.scandir(source_subfolder.path):
+                final_path = target_subfolder_f / source_file.name
+                moves.append(
+                    executor.submit(smart_move, Path(source_file.path), final_path, [], exiftool)
+                )
 
-        for source_file in source_subfolder.glob("*"):
-            final_path = Path(target_subfolder_f, source_file.name)
-            smart_move(source_file, final_path, [])
+        for move in moves:
+            move.result()  # Raise errors from the workers
 
 
 @click.group(context_settings=CONTEXT_SETTINGS)